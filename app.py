@@ -1,18 +1,19 @@
 import os
 import logging
 from datetime import datetime, timedelta
-from utils import utc_to_brasilia
+from utils import utc_to_brasilia, to_timestamp
 
-from flask import Flask
+from flask import Flask, g
 from flask_login import LoginManager
 from werkzeug.middleware.proxy_fix import ProxyFix
 
+# Configure logging (LOG_LEVEL=DEBUG for verbose output) before importing
+# modules that log on import
+logging.basicConfig(level=os.environ.get('LOG_LEVEL', 'INFO').upper())
+
 # Import our new database system
 from database import db_manager, User
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
-
 login_manager = LoginManager()
 
 # Create the app
@@ -20,6 +21,12 @@ app = Flask(__name__)
 app.secret_key = os.environ.get("SESSION_SECRET", "financeiro-inteligente-secret-key")
 app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
 
+# Take one clock reading per request so expiry checks agree with each other
+@app.before_request
+def snapshot_now():
+    g.now = datetime.utcnow()
+    g.now_ts = to_timestamp(g.now)
+
 # Make datetime and timezone functions available in templates
 @app.context_processor
 def inject_datetime():
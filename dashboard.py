@@ -2,8 +2,9 @@ from flask import Blueprint, render_template, jsonify
 from flask_login import login_required, current_user
 from models import Transaction, Account, FinancialGoal
 from database import db_manager
-from datetime import datetime, timedelta
+from datetime import timedelta
 import calendar
+from utils import utcnow
 
 dashboard_bp = Blueprint('dashboard', __name__)
 
@@ -17,7 +18,7 @@ def dashboard():
                                  message='Seu período de teste expirou. Escolha um plano para continuar.')
     
     # Get dashboard data
-    today = datetime.utcnow()
+    today = utcnow()
     current_month = today.month
     current_year = today.year
     
@@ -30,8 +31,9 @@ def dashboard():
     recent_transactions = Transaction.get_by_user_id(current_user.id, limit=5)
     
     # Accounts summary
-    pending_receivables = Account.get_pending_total(current_user.id, 'receivable')
-    pending_payables = Account.get_pending_total(current_user.id, 'payable')
+    pending_totals = Account.get_pending_totals(current_user.id)
+    pending_receivables = pending_totals['receivable']
+    pending_payables = pending_totals['payable']
     
     # Financial goals
     goals = FinancialGoal.get_by_user_id(current_user.id, is_completed=False)
@@ -57,7 +59,7 @@ def dashboard():
 @login_required
 def chart_data():
     """Provide data for dashboard charts"""
-    today = datetime.utcnow()
+    today = utcnow()
     
     # Get last 6 months data
     months_data = []
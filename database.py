@@ -1,25 +1,97 @@
 import sqlite3
 import os
-from datetime import datetime, timedelta
+import queue
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from types import MappingProxyType
 from werkzeug.security import generate_password_hash, check_password_hash
+from utils import utcnow, utcnow_timestamp, to_timestamp
 import logging
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# Applied once to every new connection: WAL lets readers run alongside the
+# writer and, with synchronous=NORMAL, commits no longer fsync each time
+CONNECTION_PRAGMAS = (
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA cache_size=-64000',
+    'PRAGMA busy_timeout=5000',
+    'PRAGMA mmap_size=268435456',
+)
+
+# Bump whenever the DDL in Database._create_tables changes
+SCHEMA_VERSION = '2'
 
 class Database:
-    def __init__(self, db_path='financial_system.db'):
+    def __init__(self, db_path='financial_system.db', pool_size=5):
         self.db_path = db_path
+        # Idle connections kept open between requests, filled lazily
+        self._pool = queue.Queue(maxsize=pool_size)
         self.init_db()
     
     def get_connection(self):
-        conn = sqlite3.connect(self.db_path)
+        """Open a new raw connection (prefer connection() for pooled access)"""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
         conn.row_factory = sqlite3.Row
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
         return conn
     
+    @contextmanager
+    def connection(self):
+        """Borrow a pooled connection for the duration of a with block"""
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self.get_connection()
+        
+        try:
+            yield conn
+        finally:
+            # Never hand a half-finished transaction to the next borrower
+            if conn.in_transaction:
+                conn.rollback()
+            try:
+                self._pool.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+    
     def init_db(self):
         """Initialize database with all required tables"""
-        conn = self.get_connection()
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('CREATE TABLE IF NOT EXISTS _meta (k TEXT PRIMARY KEY, v TEXT)')
+            if self._schema_version(cursor) == SCHEMA_VERSION:
+                # Already migrated: boot without taking the write lock
+                logger.info("Database schema up to date")
+                return
+            
+            # All DDL in one write transaction; re-check in case another
+            # worker migrated while this one waited for the lock
+            cursor.execute('BEGIN IMMEDIATE')
+            if self._schema_version(cursor) != SCHEMA_VERSION:
+                self._create_tables(conn)
+                cursor.execute('''
+                    INSERT OR REPLACE INTO _meta (k, v) VALUES ('schema_version', ?)
+                ''', (SCHEMA_VERSION,))
+            conn.commit()
+        logger.info("Database initialized successfully")
+    
+    @staticmethod
+    def _schema_version(cursor):
+        cursor.execute("SELECT v FROM _meta WHERE k = 'schema_version'")
+        row = cursor.fetchone()
+        return row[0] if row else None
+    
+    def _create_tables(self, conn):
+        """Run the schema DDL; the caller owns the surrounding transaction"""
         cursor = conn.cursor()
         
         # Users table
@@ -37,10 +109,24 @@ class Database:
                 trial_end_date TEXT,
                 subscription_plan TEXT DEFAULT 'trial',
                 subscription_status TEXT DEFAULT 'trial',
-                subscription_end_date TEXT
+                subscription_end_date TEXT,
+                trial_end_ts INTEGER,
+                subscription_end_ts INTEGER
             )
         ''')
         
+        # Epoch copies of the end dates, added to databases created before them
+        cursor.execute('PRAGMA table_info(users)')
+        user_columns = {row[1] for row in cursor.fetchall()}
+        for ts_column, date_column in (('trial_end_ts', 'trial_end_date'),
+                                       ('subscription_end_ts', 'subscription_end_date')):
+            if ts_column not in user_columns:
+                cursor.execute(f'ALTER TABLE users ADD COLUMN {ts_column} INTEGER')
+                cursor.execute(f'''
+                    UPDATE users SET {ts_column} = CAST(strftime('%s', {date_column}) AS INTEGER)
+                    WHERE {date_column} IS NOT NULL
+                ''')
+        
         # Transactions table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS transactions (
@@ -89,19 +175,226 @@ class Database:
                 FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
             )
         ''')
-        
-        conn.commit()
-        conn.close()
-        logging.info("Database initialized successfully")
+
+        # Indexes for the per-user lookups every page performs
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_tx_user_date
+            ON transactions (user_id, date DESC)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_tx_user_type_date
+            ON transactions (user_id, transaction_type, date)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_acc_user_type_status
+            ON accounts (user_id, account_type, status)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_goals_user_completed
+            ON financial_goals (user_id, is_completed)
+        ''')
+
+        # Monthly income/expense totals kept current by triggers on transactions
+        self._create_monthly_totals(conn)
+
+    def _create_monthly_totals(self, conn):
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS user_monthly_totals (
+                user_id INTEGER NOT NULL,
+                ym TEXT NOT NULL,
+                income REAL DEFAULT 0,
+                expense REAL DEFAULT 0,
+                PRIMARY KEY (user_id, ym)
+            )
+        ''')
+
+        # Recreated on every migration so trigger changes reach existing databases
+        for trigger in ('trg_tx_totals_insert', 'trg_tx_totals_delete',
+                        'trg_tx_totals_update_old', 'trg_tx_totals_update_new'):
+            cursor.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+
+        # ym is the 'YYYY-MM' prefix of the stored ISO date. Running sums are
+        # rounded to cents so adding and removing rows doesn't accumulate
+        # float error.
+        cursor.execute('''
+            CREATE TRIGGER trg_tx_totals_insert
+            AFTER INSERT ON transactions WHEN NEW.date IS NOT NULL
+            BEGIN
+                INSERT INTO user_monthly_totals (user_id, ym, income, expense)
+                VALUES (NEW.user_id, substr(NEW.date, 1, 7),
+                        CASE WHEN NEW.transaction_type = 'income' THEN NEW.amount ELSE 0 END,
+                        CASE WHEN NEW.transaction_type = 'expense' THEN NEW.amount ELSE 0 END)
+                ON CONFLICT (user_id, ym) DO UPDATE SET
+                    income = round(income + excluded.income, 2),
+                    expense = round(expense + excluded.expense, 2);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER trg_tx_totals_delete
+            AFTER DELETE ON transactions WHEN OLD.date IS NOT NULL
+            BEGIN
+                INSERT INTO user_monthly_totals (user_id, ym, income, expense)
+                VALUES (OLD.user_id, substr(OLD.date, 1, 7),
+                        CASE WHEN OLD.transaction_type = 'income' THEN -OLD.amount ELSE 0 END,
+                        CASE WHEN OLD.transaction_type = 'expense' THEN -OLD.amount ELSE 0 END)
+                ON CONFLICT (user_id, ym) DO UPDATE SET
+                    income = round(income + excluded.income, 2),
+                    expense = round(expense + excluded.expense, 2);
+            END
+        ''')
+        # Updates are handled as removing the old row and adding the new one
+        cursor.execute('''
+            CREATE TRIGGER trg_tx_totals_update_old
+            AFTER UPDATE OF user_id, amount, transaction_type, date ON transactions
+            WHEN OLD.date IS NOT NULL
+            BEGIN
+                INSERT INTO user_monthly_totals (user_id, ym, income, expense)
+                VALUES (OLD.user_id, substr(OLD.date, 1, 7),
+                        CASE WHEN OLD.transaction_type = 'income' THEN -OLD.amount ELSE 0 END,
+                        CASE WHEN OLD.transaction_type = 'expense' THEN -OLD.amount ELSE 0 END)
+                ON CONFLICT (user_id, ym) DO UPDATE SET
+                    income = round(income + excluded.income, 2),
+                    expense = round(expense + excluded.expense, 2);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER trg_tx_totals_update_new
+            AFTER UPDATE OF user_id, amount, transaction_type, date ON transactions
+            WHEN NEW.date IS NOT NULL
+            BEGIN
+                INSERT INTO user_monthly_totals (user_id, ym, income, expense)
+                VALUES (NEW.user_id, substr(NEW.date, 1, 7),
+                        CASE WHEN NEW.transaction_type = 'income' THEN NEW.amount ELSE 0 END,
+                        CASE WHEN NEW.transaction_type = 'expense' THEN NEW.amount ELSE 0 END)
+                ON CONFLICT (user_id, ym) DO UPDATE SET
+                    income = round(income + excluded.income, 2),
+                    expense = round(expense + excluded.expense, 2);
+            END
+        ''')
+
+        # Rebuild from the transactions themselves, dropping any drift in
+        # totals written by earlier versions of the triggers
+        cursor.execute('DELETE FROM user_monthly_totals')
+        cursor.execute('''
+            INSERT INTO user_monthly_totals (user_id, ym, income, expense)
+            SELECT user_id, substr(date, 1, 7),
+                   round(COALESCE(SUM(CASE WHEN transaction_type = 'income' THEN amount ELSE 0 END), 0), 2),
+                   round(COALESCE(SUM(CASE WHEN transaction_type = 'expense' THEN amount ELSE 0 END), 0), 2)
+            FROM transactions
+            WHERE date IS NOT NULL
+            GROUP BY user_id, substr(date, 1, 7)
+        ''')
 
 # Global database instance
 db_manager = Database()
 
+class TTLCache:
+    """Small thread-safe LRU mapping whose entries expire after ttl seconds"""
+    def __init__(self, maxsize=2048, ttl=30):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+    
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def pop(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+# User rows by id; Flask-Login loads the current user on every request
+_user_cache = TTLCache(maxsize=2048, ttl=30)
+
+# Werkzeug hash method for new passwords; tests may set a cheap one such as
+# 'pbkdf2:sha256:1000'. Existing hashes are verified whatever their method.
+# scrypt runs in OpenSSL with the GIL released, so concurrent logins on a
+# threaded worker don't serialize on it.
+PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt')
+
+def hash_password(password):
+    """Hash a password with the configured method"""
+    return generate_password_hash(password, method=PASSWORD_HASH_METHOD)
+
+def verify_password(password_hash, password):
+    """Check a password against a stored hash of any supported method"""
+    return check_password_hash(password_hash, password)
+
+@lru_cache(maxsize=4096)
+def parse_utc_iso(value):
+    """Parse a stored ISO timestamp into a naive UTC datetime (cached per string)"""
+    if value.endswith('Z'):
+        value = value[:-1]
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+# Read-only so the shared mappings can be handed to every request
+PLAN_FEATURES = MappingProxyType({
+    'trial': MappingProxyType({
+        'name': 'Teste Grátis',
+        'transactions_limit': 10,
+        'reports': False,
+        'automation': False,
+        'multi_user': False
+    }),
+    'mei': MappingProxyType({
+        'name': 'Plano MEI',
+        'transactions_limit': 100,
+        'reports': True,
+        'automation': False,
+        'multi_user': False
+    }),
+    'professional': MappingProxyType({
+        'name': 'Plano Profissional',
+        'transactions_limit': 500,
+        'reports': True,
+        'automation': True,
+        'multi_user': False
+    }),
+    'enterprise': MappingProxyType({
+        'name': 'Plano Empresarial',
+        'transactions_limit': -1,  # unlimited
+        'reports': True,
+        'automation': True,
+        'multi_user': True
+    })
+})
+
+# Column order shared by __slots__, the SELECTs and from_row()
+USER_COLUMNS = ('id', 'username', 'email', 'password_hash', 'full_name', 'phone',
+                'created_at', 'active', 'trial_start_date', 'trial_end_date',
+                'subscription_plan', 'subscription_status', 'subscription_end_date',
+                'trial_end_ts', 'subscription_end_ts')
+USER_SELECT = 'SELECT ' + ', '.join(USER_COLUMNS) + ' FROM users'
+
 class User:
+    __slots__ = USER_COLUMNS
+    
     def __init__(self, id=None, username=None, email=None, password_hash=None, 
                  full_name=None, phone=None, created_at=None, active=None,
                  trial_start_date=None, trial_end_date=None, subscription_plan=None,
-                 subscription_status=None, subscription_end_date=None):
+                 subscription_status=None, subscription_end_date=None,
+                 trial_end_ts=None, subscription_end_ts=None):
         self.id = id
         self.username = username
         self.email = email
@@ -115,12 +408,27 @@ class User:
         self.subscription_plan = subscription_plan or 'trial'
         self.subscription_status = subscription_status or 'trial'
         self.subscription_end_date = subscription_end_date
+        self.trial_end_ts = trial_end_ts
+        self.subscription_end_ts = subscription_end_ts
+    
+    @classmethod
+    def from_row(cls, row):
+        """Build a user from a row selected in USER_COLUMNS order"""
+        user = cls.__new__(cls)
+        (user.id, user.username, user.email, user.password_hash, user.full_name,
+         user.phone, user.created_at, user.active, user.trial_start_date,
+         user.trial_end_date, user.subscription_plan, user.subscription_status,
+         user.subscription_end_date, user.trial_end_ts, user.subscription_end_ts) = row
+        user.active = bool(user.active) if user.active is not None else True
+        user.subscription_plan = user.subscription_plan or 'trial'
+        user.subscription_status = user.subscription_status or 'trial'
+        return user
     
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
     
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return verify_password(self.password_hash, password)
     
     def is_authenticated(self):
         return True
@@ -134,124 +442,132 @@ class User:
     def get_id(self):
         return str(self.id)
     
-    def is_trial_expired(self):
+    def is_trial_expired(self, now_ts=None):
+        if now_ts is None:
+            now_ts = utcnow_timestamp()
+        if self.trial_end_ts is not None:
+            return now_ts > self.trial_end_ts
         if not self.trial_end_date:
             return False
-        trial_end = datetime.fromisoformat(self.trial_end_date.replace('Z', '+00:00'))
-        return datetime.utcnow() > trial_end
+        return now_ts > to_timestamp(parse_utc_iso(self.trial_end_date))
     
     def is_subscription_active(self):
+        now_ts = utcnow_timestamp()
         if self.subscription_status == 'trial':
-            return not self.is_trial_expired()
-        return (self.subscription_status == 'active' and 
-                self.subscription_end_date and 
-                datetime.utcnow() <= datetime.fromisoformat(self.subscription_end_date.replace('Z', '+00:00')))
+            return not self.is_trial_expired(now_ts)
+        if self.subscription_status != 'active':
+            return False
+        if self.subscription_end_ts is not None:
+            return now_ts <= self.subscription_end_ts
+        return bool(self.subscription_end_date and 
+                    now_ts <= to_timestamp(parse_utc_iso(self.subscription_end_date)))
     
     def get_plan_features(self):
-        features = {
-            'trial': {
-                'name': 'Teste Grátis',
-                'transactions_limit': 10,
-                'reports': False,
-                'automation': False,
-                'multi_user': False
-            },
-            'mei': {
-                'name': 'Plano MEI',
-                'transactions_limit': 100,
-                'reports': True,
-                'automation': False,
-                'multi_user': False
-            },
-            'professional': {
-                'name': 'Plano Profissional',
-                'transactions_limit': 500,
-                'reports': True,
-                'automation': True,
-                'multi_user': False
-            },
-            'enterprise': {
-                'name': 'Plano Empresarial',
-                'transactions_limit': -1,  # unlimited
-                'reports': True,
-                'automation': True,
-                'multi_user': True
-            }
-        }
-        return features.get(self.subscription_plan, features['trial'])
+        return PLAN_FEATURES.get(self.subscription_plan, PLAN_FEATURES['trial'])
     
     @staticmethod
     def create(username, email, password, full_name, phone=None):
         """Create a new user"""
-        conn = db_manager.get_connection()
-        cursor = conn.cursor()
-        
         # Set trial end date (7 days from now)
-        trial_end = (datetime.utcnow() + timedelta(days=7)).isoformat()
-        
-        password_hash = generate_password_hash(password)
-        
-        cursor.execute('''
-            INSERT INTO users (username, email, password_hash, full_name, phone, trial_end_date)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (username, email, password_hash, full_name, phone, trial_end))
-        
-        user_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        
+        trial_end_dt = utcnow() + timedelta(days=7)
+        trial_end = trial_end_dt.isoformat()
+
+        # Hash before borrowing a connection so it isn't held during the KDF
+        password_hash = hash_password(password)
+
+        with db_manager.connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute('''
+                INSERT INTO users (username, email, password_hash, full_name, phone,
+                                   trial_end_date, trial_end_ts)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (username, email, password_hash, full_name, phone,
+                  trial_end, to_timestamp(trial_end_dt)))
+            
+            user_id = cursor.lastrowid
+            conn.commit()
+        
+        User.invalidate_cache(user_id)
         return User.get_by_id(user_id)
     
     @staticmethod
     def get_by_id(user_id):
         """Get user by ID"""
-        conn = db_manager.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM users WHERE id = ?', (user_id,))
-        row = cursor.fetchone()
-        conn.close()
-        
-        if row:
-            return User(**dict(row))
-        return None
+        row = _user_cache.get(user_id)
+        if row is None:
+            with db_manager.connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute(USER_SELECT + ' WHERE id = ?', (user_id,))
+                row = cursor.fetchone()
+            
+            if not row:
+                return None
+            row = tuple(row)
+            _user_cache.set(user_id, row)
+        
+        # Fresh instance each time so callers can't mutate the cached row
+        return User.from_row(row)
+    
+    @staticmethod
+    def invalidate_cache(user_id):
+        """Drop the cached row for a user after it changes in the database"""
+        _user_cache.pop(user_id)
     
     @staticmethod
     def get_by_email(email):
         """Get user by email"""
-        conn = db_manager.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM users WHERE email = ?', (email,))
-        row = cursor.fetchone()
-        conn.close()
+        with db_manager.connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute(USER_SELECT + ' WHERE email = ?', (email,))
+            row = cursor.fetchone()
         
         if row:
-            return User(**dict(row))
+            return User.from_row(row)
         return None
     
     @staticmethod
     def get_by_username(username):
         """Get user by username"""
-        conn = db_manager.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM users WHERE username = ?', (username,))
-        row = cursor.fetchone()
-        conn.close()
+        with db_manager.connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute(USER_SELECT + ' WHERE username = ?', (username,))
+            row = cursor.fetchone()
         
         if row:
-            return User(**dict(row))
+            return User.from_row(row)
         return None
 
+TRANSACTION_COLUMNS = ('id', 'user_id', 'description', 'amount', 'transaction_type',
+                       'category', 'date', 'created_at', 'is_recurring',
+                       'recurrence_type', 'account_id')
+TRANSACTION_SELECT = 'SELECT ' + ', '.join(TRANSACTION_COLUMNS) + ' FROM transactions'
+
+# Orderings accepted by Transaction.get_by_user_id; anything else is rejected
+# rather than interpolated into the SQL
+TRANSACTION_ORDERINGS = ('date DESC', 'date ASC', 'amount DESC')
+
+# Keyed by (order_by, has_limit)
+TRANSACTION_QUERIES = {
+    (order_by, limited): f'{TRANSACTION_SELECT} WHERE user_id = ? ORDER BY {order_by}'
+                         + (' LIMIT ?' if limited else '')
+    for order_by in TRANSACTION_ORDERINGS
+    for limited in (False, True)
+}
+
 class Transaction:
+    __slots__ = TRANSACTION_COLUMNS
+    
     def __init__(self, id=None, user_id=None, description=None, amount=None,
                  transaction_type=None, category=None, date=None, created_at=None,
                  is_recurring=None, recurrence_type=None, account_id=None):
         self.id = id
         self.user_id = user_id
         self.description = description
-        self.amount = float(amount) if amount else 0.0
+        self.amount = amount or 0.0
         self.transaction_type = transaction_type
         self.category = category
         self.date = date
@@ -260,177 +576,265 @@ class Transaction:
         self.recurrence_type = recurrence_type
         self.account_id = account_id
     
+    @classmethod
+    def from_row(cls, row):
+        """Build a transaction from a row selected in TRANSACTION_COLUMNS order"""
+        transaction = cls.__new__(cls)
+        (transaction.id, transaction.user_id, transaction.description,
+         transaction.amount, transaction.transaction_type, transaction.category,
+         transaction.date, transaction.created_at, transaction.is_recurring,
+         transaction.recurrence_type, transaction.account_id) = row
+        transaction.is_recurring = bool(transaction.is_recurring)
+        return transaction
+    
     def save(self):
         """Save transaction to database"""
-        conn = db_manager.get_connection()
-        cursor = conn.cursor()
+        with db_manager.connection() as conn:
+            cursor = conn.cursor()
+            
+            if self.id:
+                # Update existing
+                cursor.execute('''
+                    UPDATE transactions 
+                    SET description=?, amount=?, transaction_type=?, category=?, 
+                        date=?, is_recurring=?, recurrence_type=?, account_id=?
+                    WHERE id=?
+                ''', (self.description, self.amount, self.transaction_type, self.category,
+                      self.date, self.is_recurring, self.recurrence_type, self.account_id, self.id))
+            else:
+                # Create new
+                cursor.execute('''
+                    INSERT INTO transactions (user_id, description, amount, transaction_type, 
+                                            category, date, is_recurring, recurrence_type, account_id)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (self.user_id, self.description, self.amount, self.transaction_type,
+                      self.category, self.date, self.is_recurring, self.recurrence_type, self.account_id))
+                self.id = cursor.lastrowid
+            
+            conn.commit()
+        return self
+    
+    @staticmethod
+    def bulk_save(transactions):
+        """Insert many new transactions in a single database transaction
         
-        if self.id:
-            # Update existing
-            cursor.execute('''
-                UPDATE transactions 
-                SET description=?, amount=?, transaction_type=?, category=?, 
-                    date=?, is_recurring=?, recurrence_type=?, account_id=?
-                WHERE id=?
-            ''', (self.description, self.amount, self.transaction_type, self.category,
-                  self.date, self.is_recurring, self.recurrence_type, self.account_id, self.id))
-        else:
-            # Create new
-            cursor.execute('''
+        Unlike save(), the ids of the inserted rows are not set on the objects.
+        """
+        with db_manager.connection() as conn:
+            conn.executemany('''
                 INSERT INTO transactions (user_id, description, amount, transaction_type, 
                                         category, date, is_recurring, recurrence_type, account_id)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (self.user_id, self.description, self.amount, self.transaction_type,
-                  self.category, self.date, self.is_recurring, self.recurrence_type, self.account_id))
-            self.id = cursor.lastrowid
+            ''', [(t.user_id, t.description, t.amount, t.transaction_type, t.category,
+                   t.date, t.is_recurring, t.recurrence_type, t.account_id)
+                  for t in transactions])
+            conn.commit()
+    
+    @staticmethod
+    def iter_by_user_id(user_id, limit=None, order_by='date DESC'):
+        """Yield transactions by user ID straight from the cursor
         
-        conn.commit()
-        conn.close()
-        return self
+        The pooled connection stays checked out until the generator is
+        exhausted or closed.
+        """
+        if order_by not in TRANSACTION_ORDERINGS:
+            raise ValueError(f'Unsupported transaction ordering: {order_by!r}')
+        
+        return Transaction._iter_rows(user_id, limit, order_by)
+    
+    @staticmethod
+    def _iter_rows(user_id, limit, order_by):
+        with db_manager.connection() as conn:
+            cursor = conn.cursor()
+            
+            # Constant SQL text lets sqlite3 reuse the connection's prepared statement
+            if limit:
+                cursor.execute(TRANSACTION_QUERIES[order_by, True], (user_id, limit))
+            else:
+                cursor.execute(TRANSACTION_QUERIES[order_by, False], (user_id,))
+            
+            # Close the cursor before the connection goes back to the pool,
+            # otherwise an abandoned generator leaves a read snapshot open on it
+            try:
+                for row in cursor:
+                    yield Transaction.from_row(row)
+            finally:
+                cursor.close()
     
     @staticmethod
     def get_by_user_id(user_id, limit=None, order_by='date DESC'):
         """Get transactions by user ID"""
-        conn = db_manager.get_connection()
-        cursor = conn.cursor()
-        
-        query = f'SELECT * FROM transactions WHERE user_id = ? ORDER BY {order_by}'
-        if limit:
-            query += f' LIMIT {limit}'
-        
-        cursor.execute(query, (user_id,))
-        rows = cursor.fetchall()
-        conn.close()
-        
-        return [Transaction(**dict(row)) for row in rows]
+        return list(Transaction.iter_by_user_id(user_id, limit, order_by))
     
     @staticmethod
     def count_by_user_id(user_id):
         """Count transactions by user ID"""
-        conn = db_manager.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT COUNT(*) FROM transactions WHERE user_id = ?', (user_id,))
-        count = cursor.fetchone()[0]
-        conn.close()
+        with db_manager.connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('SELECT COUNT(*) FROM transactions WHERE user_id = ?', (user_id,))
+            count = cursor.fetchone()[0]
         
         return count
     
+    @staticmethod
+    def has_reached_limit(user_id, limit):
+        """Check whether a user has at least `limit` transactions (-1 means unlimited)"""
+        if limit < 0:
+            return False
+        if limit == 0:
+            return True
+        with db_manager.connection() as conn:
+            cursor = conn.cursor()
+            
+            # Stops at the limit-th row instead of counting them all
+            cursor.execute('''
+                SELECT EXISTS(SELECT 1 FROM transactions WHERE user_id = ? LIMIT 1 OFFSET ?)
+            ''', (user_id, limit - 1))
+            reached = cursor.fetchone()[0]
+        
+        return bool(reached)
+    
     @staticmethod
     def get_monthly_summary(user_id, month, year):
         """Get monthly income and expenses summary"""
-        conn = db_manager.get_connection()
-        cursor = conn.cursor()
-        
-        # Get monthly income
-        cursor.execute('''
-            SELECT COALESCE(SUM(amount), 0) FROM transactions 
-            WHERE user_id = ? AND transaction_type = 'income' 
-            AND strftime('%m', date) = ? AND strftime('%Y', date) = ?
-        ''', (user_id, f'{month:02d}', str(year)))
-        
-        income = cursor.fetchone()[0]
-        
-        # Get monthly expenses
-        cursor.execute('''
-            SELECT COALESCE(SUM(amount), 0) FROM transactions 
-            WHERE user_id = ? AND transaction_type = 'expense' 
-            AND strftime('%m', date) = ? AND strftime('%Y', date) = ?
-        ''', (user_id, f'{month:02d}', str(year)))
-        
-        expenses = cursor.fetchone()[0]
-        conn.close()
-        
-        return float(income), float(expenses)
+        with db_manager.connection() as conn:
+            cursor = conn.cursor()
+            
+            # Maintained by the trg_tx_totals_* triggers, so this is a primary key lookup
+            cursor.execute('''
+                SELECT income, expense FROM user_monthly_totals
+                WHERE user_id = ? AND ym = ?
+            ''', (user_id, f'{year:04d}-{month:02d}'))
+            
+            row = cursor.fetchone()
+        
+        if row is None:
+            return 0.0, 0.0
+        return float(row[0]), float(row[1])
+
+ACCOUNT_COLUMNS = ('id', 'user_id', 'name', 'account_type', 'amount', 'due_date',
+                   'status', 'created_at')
+ACCOUNT_SELECT = 'SELECT ' + ', '.join(ACCOUNT_COLUMNS) + ' FROM accounts'
 
 class Account:
+    __slots__ = ACCOUNT_COLUMNS
+    
     def __init__(self, id=None, user_id=None, name=None, account_type=None,
                  amount=None, due_date=None, status=None, created_at=None):
         self.id = id
         self.user_id = user_id
         self.name = name
         self.account_type = account_type
-        self.amount = float(amount) if amount else 0.0
+        self.amount = amount or 0.0
         self.due_date = due_date
         self.status = status or 'pending'
         self.created_at = created_at
     
+    @classmethod
+    def from_row(cls, row):
+        """Build an account from a row selected in ACCOUNT_COLUMNS order"""
+        account = cls.__new__(cls)
+        (account.id, account.user_id, account.name, account.account_type,
+         account.amount, account.due_date, account.status, account.created_at) = row
+        account.amount = account.amount or 0.0
+        account.status = account.status or 'pending'
+        return account
+    
     def save(self):
         """Save account to database"""
-        conn = db_manager.get_connection()
-        cursor = conn.cursor()
+        with db_manager.connection() as conn:
+            cursor = conn.cursor()
+            
+            if self.id:
+                # Update existing
+                cursor.execute('''
+                    UPDATE accounts 
+                    SET name=?, account_type=?, amount=?, due_date=?, status=?
+                    WHERE id=?
+                ''', (self.name, self.account_type, self.amount, self.due_date, self.status, self.id))
+            else:
+                # Create new
+                cursor.execute('''
+                    INSERT INTO accounts (user_id, name, account_type, amount, due_date, status)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', (self.user_id, self.name, self.account_type, self.amount, self.due_date, self.status))
+                self.id = cursor.lastrowid
+            
+            conn.commit()
+        return self
+    
+    @staticmethod
+    def bulk_save(accounts):
+        """Insert many new accounts in a single database transaction
         
-        if self.id:
-            # Update existing
-            cursor.execute('''
-                UPDATE accounts 
-                SET name=?, account_type=?, amount=?, due_date=?, status=?
-                WHERE id=?
-            ''', (self.name, self.account_type, self.amount, self.due_date, self.status, self.id))
-        else:
-            # Create new
-            cursor.execute('''
+        Unlike save(), the ids of the inserted rows are not set on the objects.
+        """
+        with db_manager.connection() as conn:
+            conn.executemany('''
                 INSERT INTO accounts (user_id, name, account_type, amount, due_date, status)
                 VALUES (?, ?, ?, ?, ?, ?)
-            ''', (self.user_id, self.name, self.account_type, self.amount, self.due_date, self.status))
-            self.id = cursor.lastrowid
-        
-        conn.commit()
-        conn.close()
-        return self
+            ''', [(a.user_id, a.name, a.account_type, a.amount, a.due_date, a.status)
+                  for a in accounts])
+            conn.commit()
     
     @staticmethod
     def get_by_user_id(user_id, account_type=None):
         """Get accounts by user ID and optionally by type"""
-        conn = db_manager.get_connection()
-        cursor = conn.cursor()
-        
-        if account_type:
-            cursor.execute('SELECT * FROM accounts WHERE user_id = ? AND account_type = ?', 
-                          (user_id, account_type))
-        else:
-            cursor.execute('SELECT * FROM accounts WHERE user_id = ?', (user_id,))
-        
-        rows = cursor.fetchall()
-        conn.close()
-        
-        return [Account(**dict(row)) for row in rows]
+        with db_manager.connection() as conn:
+            cursor = conn.cursor()
+            
+            if account_type:
+                cursor.execute(ACCOUNT_SELECT + ' WHERE user_id = ? AND account_type = ?', 
+                              (user_id, account_type))
+            else:
+                cursor.execute(ACCOUNT_SELECT + ' WHERE user_id = ?', (user_id,))
+            
+            rows = cursor.fetchall()
+        
+        return [Account.from_row(row) for row in rows]
     
     @staticmethod
     def get_by_id(account_id, user_id=None):
         """Get account by ID, optionally filtered by user"""
-        conn = db_manager.get_connection()
-        cursor = conn.cursor()
-        
-        if user_id:
-            cursor.execute('SELECT * FROM accounts WHERE id = ? AND user_id = ?', (account_id, user_id))
-        else:
-            cursor.execute('SELECT * FROM accounts WHERE id = ?', (account_id,))
-        
-        row = cursor.fetchone()
-        conn.close()
+        with db_manager.connection() as conn:
+            cursor = conn.cursor()
+            
+            if user_id:
+                cursor.execute(ACCOUNT_SELECT + ' WHERE id = ? AND user_id = ?', (account_id, user_id))
+            else:
+                cursor.execute(ACCOUNT_SELECT + ' WHERE id = ?', (account_id,))
+            
+            row = cursor.fetchone()
         
         if row:
-            return Account(**dict(row))
+            return Account.from_row(row)
         return None
     
     @staticmethod
-    def get_pending_total(user_id, account_type):
-        """Get total amount for pending accounts of a specific type"""
-        conn = db_manager.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT COALESCE(SUM(amount), 0) FROM accounts 
-            WHERE user_id = ? AND account_type = ? AND status = 'pending'
-        ''', (user_id, account_type))
-        
-        total = cursor.fetchone()[0]
-        conn.close()
-        
-        return float(total)
+    def get_pending_totals(user_id):
+        """Get pending totals for every account type in one query"""
+        with db_manager.connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT account_type, COALESCE(SUM(amount), 0) FROM accounts 
+                WHERE user_id = ? AND status = 'pending'
+                GROUP BY account_type
+            ''', (user_id,))
+            
+            totals = {'receivable': 0.0, 'payable': 0.0}
+            totals.update((row[0], float(row[1])) for row in cursor)
+        
+        return totals
+
+GOAL_COLUMNS = ('id', 'user_id', 'title', 'target_amount', 'current_amount',
+                'target_date', 'created_at', 'is_completed')
+GOAL_SELECT = 'SELECT ' + ', '.join(GOAL_COLUMNS) + ' FROM financial_goals'
 
 class FinancialGoal:
+    __slots__ = GOAL_COLUMNS
+    
     def __init__(self, id=None, user_id=None, title=None, target_amount=None,
                  current_amount=None, target_date=None, created_at=None, is_completed=None):
         self.id = id
@@ -442,6 +846,17 @@ class FinancialGoal:
         self.created_at = created_at
         self.is_completed = bool(is_completed) if is_completed else False
     
+    @classmethod
+    def from_row(cls, row):
+        """Build a goal from a row selected in GOAL_COLUMNS order"""
+        goal = cls.__new__(cls)
+        (goal.id, goal.user_id, goal.title, goal.target_amount, goal.current_amount,
+         goal.target_date, goal.created_at, goal.is_completed) = row
+        goal.target_amount = goal.target_amount or 0.0
+        goal.current_amount = goal.current_amount or 0.0
+        goal.is_completed = bool(goal.is_completed)
+        return goal
+    
     def get_progress_percentage(self):
         if self.target_amount == 0:
             return 0
@@ -449,43 +864,56 @@ class FinancialGoal:
     
     def save(self):
         """Save goal to database"""
-        conn = db_manager.get_connection()
-        cursor = conn.cursor()
+        with db_manager.connection() as conn:
+            cursor = conn.cursor()
+            
+            if self.id:
+                # Update existing
+                cursor.execute('''
+                    UPDATE financial_goals 
+                    SET title=?, target_amount=?, current_amount=?, target_date=?, is_completed=?
+                    WHERE id=?
+                ''', (self.title, self.target_amount, self.current_amount, 
+                      self.target_date, self.is_completed, self.id))
+            else:
+                # Create new
+                cursor.execute('''
+                    INSERT INTO financial_goals (user_id, title, target_amount, current_amount, target_date, is_completed)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', (self.user_id, self.title, self.target_amount, self.current_amount, 
+                      self.target_date, self.is_completed))
+                self.id = cursor.lastrowid
+            
+            conn.commit()
+        return self
+    
+    @staticmethod
+    def bulk_save(goals):
+        """Insert many new goals in a single database transaction
         
-        if self.id:
-            # Update existing
-            cursor.execute('''
-                UPDATE financial_goals 
-                SET title=?, target_amount=?, current_amount=?, target_date=?, is_completed=?
-                WHERE id=?
-            ''', (self.title, self.target_amount, self.current_amount, 
-                  self.target_date, self.is_completed, self.id))
-        else:
-            # Create new
-            cursor.execute('''
+        Unlike save(), the ids of the inserted rows are not set on the objects.
+        """
+        with db_manager.connection() as conn:
+            conn.executemany('''
                 INSERT INTO financial_goals (user_id, title, target_amount, current_amount, target_date, is_completed)
                 VALUES (?, ?, ?, ?, ?, ?)
-            ''', (self.user_id, self.title, self.target_amount, self.current_amount, 
-                  self.target_date, self.is_completed))
-            self.id = cursor.lastrowid
-        
-        conn.commit()
-        conn.close()
-        return self
+            ''', [(g.user_id, g.title, g.target_amount, g.current_amount,
+                   g.target_date, g.is_completed)
+                  for g in goals])
+            conn.commit()
     
     @staticmethod
     def get_by_user_id(user_id, is_completed=None):
         """Get financial goals by user ID"""
-        conn = db_manager.get_connection()
-        cursor = conn.cursor()
-        
-        if is_completed is not None:
-            cursor.execute('SELECT * FROM financial_goals WHERE user_id = ? AND is_completed = ?', 
-                          (user_id, is_completed))
-        else:
-            cursor.execute('SELECT * FROM financial_goals WHERE user_id = ?', (user_id,))
-        
-        rows = cursor.fetchall()
-        conn.close()
-        
-        return [FinancialGoal(**dict(row)) for row in rows]
\ No newline at end of file
+        with db_manager.connection() as conn:
+            cursor = conn.cursor()
+            
+            if is_completed is not None:
+                cursor.execute(GOAL_SELECT + ' WHERE user_id = ? AND is_completed = ?', 
+                              (user_id, is_completed))
+            else:
+                cursor.execute(GOAL_SELECT + ' WHERE user_id = ?', (user_id,))
+            
+            rows = cursor.fetchall()
+        
+        return [FinancialGoal.from_row(row) for row in rows]
\ No newline at end of file
@@ -12,9 +12,8 @@ financial_bp = Blueprint('financial', __name__)
 def cash_flow():
     # Check plan limits
     features = current_user.get_plan_features()
-    transaction_count = Transaction.count_by_user_id(current_user.id)
     
-    if features['transactions_limit'] != -1 and transaction_count >= features['transactions_limit']:
+    if Transaction.has_reached_limit(current_user.id, features['transactions_limit']):
         flash('Você atingiu o limite de transações do seu plano. Faça upgrade para continuar.', 'warning')
     
     # Get all transactions
@@ -37,9 +36,8 @@ def cash_flow():
 def add_transaction():
     # Check plan limits
     features = current_user.get_plan_features()
-    transaction_count = Transaction.count_by_user_id(current_user.id)
     
-    if features['transactions_limit'] != -1 and transaction_count >= features['transactions_limit']:
+    if Transaction.has_reached_limit(current_user.id, features['transactions_limit']):
         flash('Você atingiu o limite de transações do seu plano. Faça upgrade para continuar.', 'error')
         return redirect(url_for('subscription.plans'))
     
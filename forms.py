@@ -1,8 +1,40 @@
 from flask_wtf import FlaskForm
-from wtforms import StringField, PasswordField, SubmitField, BooleanField, SelectField, TextAreaField, DecimalField, DateTimeField, DateField
+from wtforms import StringField, PasswordField, SubmitField, BooleanField, SelectField, TextAreaField, FloatField, DateTimeField, DateField
 from wtforms.validators import DataRequired, Email, EqualTo, Length, NumberRange
 from wtforms.widgets import NumberInput
 
+# Select choices built once at import and shared by every form instance
+_TX_TYPE_CHOICES = (
+    ('income', 'Receita'),
+    ('expense', 'Despesa'),
+)
+
+_TX_CATEGORY_CHOICES = (
+    ('vendas', 'Vendas'),
+    ('servicos', 'Serviços'),
+    ('marketing', 'Marketing'),
+    ('fornecedores', 'Fornecedores'),
+    ('impostos', 'Impostos'),
+    ('despesas_gerais', 'Despesas Gerais'),
+    ('outros', 'Outros'),
+)
+
+_ACCOUNT_TYPE_CHOICES = (
+    ('receivable', 'Conta a Receber'),
+    ('payable', 'Conta a Pagar'),
+)
+
+class FloatAmountField(FloatField):
+    """Money amount parsed straight to float, accepting ',' as the decimal separator"""
+    def process_formdata(self, valuelist):
+        if not valuelist:
+            return
+        try:
+            self.data = float(valuelist[0].replace(',', '.'))
+        except ValueError as exc:
+            self.data = None
+            raise ValueError(self.gettext('Not a valid float value.')) from exc
+
 class LoginForm(FlaskForm):
     email = StringField('Email', validators=[DataRequired(), Email()])
     password = PasswordField('Senha', validators=[DataRequired()])
@@ -24,26 +56,15 @@ class ForgotPasswordForm(FlaskForm):
 
 class TransactionForm(FlaskForm):
     description = StringField('Descrição', validators=[DataRequired(), Length(max=200)])
-    amount = DecimalField('Valor', validators=[DataRequired(), NumberRange(min=0.01)], widget=NumberInput(step=0.01))
-    transaction_type = SelectField('Tipo', choices=[('income', 'Receita'), ('expense', 'Despesa')], validators=[DataRequired()])
-    category = SelectField('Categoria', choices=[
-        ('vendas', 'Vendas'),
-        ('servicos', 'Serviços'),
-        ('marketing', 'Marketing'),
-        ('fornecedores', 'Fornecedores'),
-        ('impostos', 'Impostos'),
-        ('despesas_gerais', 'Despesas Gerais'),
-        ('outros', 'Outros')
-    ])
+    amount = FloatAmountField('Valor', validators=[DataRequired(), NumberRange(min=0.01)], widget=NumberInput(step=0.01))
+    transaction_type = SelectField('Tipo', choices=_TX_TYPE_CHOICES, validators=[DataRequired()])
+    category = SelectField('Categoria', choices=_TX_CATEGORY_CHOICES)
     date = DateField('Data', validators=[DataRequired()])
     submit = SubmitField('Salvar')
 
 class AccountForm(FlaskForm):
     name = StringField('Nome/Descrição', validators=[DataRequired(), Length(max=100)])
-    account_type = SelectField('Tipo', choices=[
-        ('receivable', 'Conta a Receber'),
-        ('payable', 'Conta a Pagar')
-    ], validators=[DataRequired()])
-    amount = DecimalField('Valor', validators=[DataRequired(), NumberRange(min=0.01)], widget=NumberInput(step=0.01))
+    account_type = SelectField('Tipo', choices=_ACCOUNT_TYPE_CHOICES, validators=[DataRequired()])
+    amount = FloatAmountField('Valor', validators=[DataRequired(), NumberRange(min=0.01)], widget=NumberInput(step=0.01))
     due_date = DateField('Data de Vencimento', validators=[DataRequired()])
     submit = SubmitField('Salvar')
@@ -11,7 +11,7 @@ from reportlab.lib.units import inch
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image, PageBreak
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.enums import TA_CENTER, TA_RIGHT, TA_LEFT
-from utils import utc_to_brasilia, format_currency
+from utils import utc_to_brasilia, format_currency, utcnow
 
 reports_bp = Blueprint('reports', __name__)
 
@@ -26,7 +26,7 @@ def reports():
                              message='Relatórios estão disponíveis apenas para planos pagos.')
     
     # Generate reports data
-    today = datetime.utcnow()
+    today = utcnow()
     current_month = today.month
     current_year = today.year
     
@@ -49,18 +49,17 @@ def reports():
     monthly_data.reverse()
     
     # Category analysis
-    conn = db_manager.get_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        SELECT category, SUM(amount) as total 
-        FROM transactions 
-        WHERE user_id = ? AND transaction_type = 'expense' AND category IS NOT NULL
-        GROUP BY category
-    ''', (current_user.id,))
-    
-    category_data = [{'category': row[0], 'total': float(row[1])} for row in cursor.fetchall()]
-    conn.close()
+    with db_manager.connection() as conn:
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT category, SUM(amount) as total 
+            FROM transactions 
+            WHERE user_id = ? AND transaction_type = 'expense' AND category IS NOT NULL
+            GROUP BY category
+        ''', (current_user.id,))
+        
+        category_data = [{'category': row[0], 'total': float(row[1])} for row in cursor.fetchall()]
     
     # Calculate KPIs
     total_income = sum(m['income'] for m in monthly_data)
@@ -71,16 +70,15 @@ def reports():
     avg_ticket = total_income / max(1, transaction_count)
     
     # Overdue accounts
-    conn = db_manager.get_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        SELECT COUNT(*) FROM accounts 
-        WHERE user_id = ? AND status = 'pending' AND due_date < ?
-    ''', (current_user.id, today.isoformat()))
-    
-    overdue_accounts = cursor.fetchone()[0]
-    conn.close()
+    with db_manager.connection() as conn:
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT COUNT(*) FROM accounts 
+            WHERE user_id = ? AND status = 'pending' AND due_date < ?
+        ''', (current_user.id, today.isoformat()))
+        
+        overdue_accounts = cursor.fetchone()[0]
     
     return render_template('reports/reports.html',
                          monthly_data=monthly_data,
@@ -125,7 +123,7 @@ def export_pdf():
         response.headers['Content-Type'] = 'application/pdf'
         
         # Generate filename with current date
-        now = utc_to_brasilia(datetime.utcnow())
+        now = utc_to_brasilia(utcnow())
         filename = f"relatorio_financeiro_{now.strftime('%Y%m%d_%H%M')}.pdf"
         response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
         
@@ -165,7 +163,7 @@ def build_pdf_content():
     content.append(Spacer(1, 20))
     
     # User info and period
-    now = utc_to_brasilia(datetime.utcnow())
+    now = utc_to_brasilia(utcnow())
     content.append(Paragraph(f"<b>Usuário:</b> {current_user.full_name}", styles['Normal']))
     content.append(Paragraph(f"<b>Plano:</b> {current_user.get_plan_features()['name']}", styles['Normal']))
     content.append(Paragraph(f"<b>Data:</b> {now.strftime('%d/%m/%Y às %H:%M')}", styles['Normal']))
@@ -175,7 +173,7 @@ def build_pdf_content():
     content.append(Paragraph("Resumo Financeiro", subtitle_style))
     
     # Get financial data
-    today = datetime.utcnow()
+    today = utcnow()
     current_month = today.month
     current_year = today.year
     
@@ -264,18 +262,17 @@ def build_pdf_content():
     # Category analysis
     content.append(Paragraph("Análise por Categorias", subtitle_style))
     
-    conn = db_manager.get_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        SELECT category, SUM(amount) as total 
-        FROM transactions 
-        WHERE user_id = ? AND transaction_type = 'expense' AND category IS NOT NULL
-        GROUP BY category
-    ''', (current_user.id,))
-    
-    category_data = cursor.fetchall()
-    conn.close()
+    with db_manager.connection() as conn:
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT category, SUM(amount) as total 
+            FROM transactions 
+            WHERE user_id = ? AND transaction_type = 'expense' AND category IS NOT NULL
+            GROUP BY category
+        ''', (current_user.id,))
+        
+        category_data = cursor.fetchall()
     
     if category_data:
         cat_data = [['Categoria', 'Total Gasto']]
@@ -2,7 +2,8 @@ from flask import Blueprint, render_template, redirect, url_for, flash, request
 from flask_login import login_required, current_user
 from models import User
 from database import db_manager
-from datetime import datetime, timedelta
+from datetime import timedelta
+from utils import utcnow, to_timestamp
 
 subscription_bp = Blueprint('subscription', __name__)
 
@@ -94,25 +95,30 @@ def activate_plan(plan_id):
         return redirect(url_for('subscription.plans'))
     
     # Update user subscription in database
-    conn = db_manager.get_connection()
-    cursor = conn.cursor()
+    with db_manager.connection() as conn:
+        cursor = conn.cursor()
+        
+        # Set subscription end date to 30 days from now
+        end_dt = utcnow() + timedelta(days=30)
+        end_date = end_dt.isoformat()
+        end_ts = to_timestamp(end_dt)
+        
+        cursor.execute('''
+            UPDATE users 
+            SET subscription_plan = ?, subscription_status = 'active',
+                subscription_end_date = ?, subscription_end_ts = ?
+            WHERE id = ?
+        ''', (plan_id, end_date, end_ts, current_user.id))
+        
+        conn.commit()
     
-    # Set subscription end date to 30 days from now
-    end_date = (datetime.utcnow() + timedelta(days=30)).isoformat()
-    
-    cursor.execute('''
-        UPDATE users 
-        SET subscription_plan = ?, subscription_status = 'active', subscription_end_date = ?
-        WHERE id = ?
-    ''', (plan_id, end_date, current_user.id))
-    
-    conn.commit()
-    conn.close()
+    User.invalidate_cache(current_user.id)
     
     # Update current_user object
     current_user.subscription_plan = plan_id
     current_user.subscription_status = 'active'
     current_user.subscription_end_date = end_date
+    current_user.subscription_end_ts = end_ts
     
     plan_names = {
         'mei': 'Plano MEI',
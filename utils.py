@@ -1,6 +1,6 @@
-from datetime import datetime
+from datetime import datetime, timezone
 from functools import wraps
-from flask import redirect, url_for, flash
+from flask import redirect, url_for, flash, g, has_app_context
 from flask_login import current_user
 import pytz
 
@@ -18,6 +18,22 @@ def subscription_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+def utcnow():
+    """Current naive UTC datetime, shared across a request when one is active"""
+    if has_app_context() and 'now' in g:
+        return g.now
+    return datetime.utcnow()
+
+def to_timestamp(utc_dt):
+    """Convert a naive UTC datetime to integer Unix epoch seconds"""
+    return int(utc_dt.replace(tzinfo=timezone.utc).timestamp())
+
+def utcnow_timestamp():
+    """Current Unix epoch seconds, shared across a request when one is active"""
+    if has_app_context() and 'now_ts' in g:
+        return g.now_ts
+    return to_timestamp(datetime.utcnow())
+
 def format_currency(value):
     """Format value as Brazilian currency"""
     return f"R$ {value:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")